@@ -1,6 +1,8 @@
 import os
 import logging
 import uvicorn
+import aiohttp
+import asyncio
 import importlib.util
 import time
 
@@ -18,7 +20,7 @@ from slowapi.util import get_ipaddr
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
 
-from utils.utils import config
+from utils.utils import config, create_indexes
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -64,6 +66,14 @@ include_routers(app, os.path.join(os.path.dirname(__file__), "routers", "v2"))
 @app.on_event("startup")
 async def startup_event():
     FastAPICache.init(InMemoryBackend())
+    app.state.http = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300))
+    # Built in the background so an unreachable Mongo can't hold up or fail startup
+    app.state.index_task = asyncio.create_task(create_indexes())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await app.state.http.close()
 
 
 @app.get("/", include_in_schema=False, response_class=RedirectResponse)
@@ -49,7 +49,7 @@ async def capital_stats_district(weekend: str, request: Request, response: Respo
              }},
         {"$sort": {"_id.district_name": 1, "_id.district_level": 1}}
     ]
-    results = await db_client.capital.aggregate(pipeline=pipeline).to_list(length=None)
+    results = await (await db_client.capital.aggregate(pipeline=pipeline)).to_list(length=None)
     return results
 
 @router.get("/capital/stats/leagues",
@@ -123,7 +123,7 @@ async def capital_stats_leagues(weekend: str, request: Request, response: Respon
               "sampleSize" : {"$sum" : 1}
               }},
     ]
-    results = await db_client.capital.aggregate(pipeline=pipeline).to_list(length=None)
+    results = await (await db_client.capital.aggregate(pipeline=pipeline)).to_list(length=None)
     results.sort(key=lambda val : leagues.index(val.get("_id")))
     return results
 
@@ -1,18 +1,21 @@
-import json
+import asyncio
+import orjson
 import uuid
 from typing import List
 import pendulum as pend
 
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
+from pymongo import ReturnDocument
 
 from routers.public.tickets import get_channels, get_roles
 from utils.utils import db_client, validate_token, delete_from_cdn
+from utils.templating import templates
 
 router = APIRouter(prefix="/giveaway", include_in_schema=False)
-templates = Jinja2Templates(directory="templates")
+
+DASHBOARD_LIMIT = 200
 
 from fastapi import Form, UploadFile, File
 from fastapi.responses import JSONResponse
@@ -37,15 +40,26 @@ async def giveaway_dashboard(request: Request, token: str, message: str = None):
 
     server_id = token_data["server_id"]
     channels = await get_channels(guild_id=server_id)
-    print(channels)
 
-    # Fetch all giveaways for the server
-    giveaways = await db_client.giveaways.find({"server_id": server_id}).to_list(length=None)
+    # Bucket the server's giveaways by status in a single pass. Sorting on end_time puts every
+    # unfinished giveaway ahead of the ended ones, so the cap only ever trims old ended giveaways.
+    # Only what the dashboard rows show is fetched, entries are reduced to their count
+    buckets = {"ongoing": [], "scheduled": [], "ended": []}
+    cursor = db_client.giveaways.find(
+        {"server_id": server_id},
+        {
+            "prize": 1, "status": 1, "start_time": 1, "end_time": 1, "channel_id": 1, "winners": 1,
+            "entry_count": {"$size": {"$ifNull": ["$entries", []]}}
+        }
+    ).sort("end_time", -1).limit(DASHBOARD_LIMIT).batch_size(DASHBOARD_LIMIT)
+    async for giveaway in cursor:
+        buckets.setdefault(giveaway["status"], []).append(giveaway)
 
-    # Sort giveaways by status and time
-    ongoing = sorted([g for g in giveaways if g["status"] == "ongoing"], key=lambda g: g["start_time"], reverse=True)
-    upcoming = sorted([g for g in giveaways if g["status"] == "scheduled"], key=lambda g: g["start_time"], reverse=True)
-    ended = sorted([g for g in giveaways if g["status"] == "ended"], key=lambda g: g["start_time"], reverse=True)
+    # Rows are shown newest start first
+    ongoing, upcoming, ended = (
+        sorted(buckets[status], key=lambda g: g["start_time"], reverse=True)
+        for status in ("ongoing", "scheduled", "ended")
+    )
 
     return templates.TemplateResponse("giveaways/giveaways_dashboard.html", {
         "request": request,
@@ -86,7 +100,6 @@ async def submit_giveaway_form(
     Handle form submissions to create or update a giveaway.
     """
     # Convert start_time and end_time to datetime objects
-    print(start_time)
     if now:
         start_time = pend.now(tz=pend.UTC)  # Use the current time in UTC
     elif start_time:
@@ -100,9 +113,9 @@ async def submit_giveaway_form(
 
     # Decode boosters & roles
     try:
-        boosters = json.loads(boosters_json)  # [{value: "2.5", roles: ["role1", "role2"]}]
-        roles = json.loads(roles_json)  # ["role1", "role2"]
-    except json.JSONDecodeError:
+        boosters = orjson.loads(boosters_json)  # [{value: "2.5", roles: ["role1", "role2"]}]
+        roles = orjson.loads(roles_json)  # ["role1", "role2"]
+    except orjson.JSONDecodeError:
         return JSONResponse({"status": "error", "message": "Invalid JSON data for roles or boosters"},
                             status_code=400)
 
@@ -120,26 +133,13 @@ async def submit_giveaway_form(
 
     # Image logic
     image_url = None
-    if remove_image:
-        # Retrieve the current image URL from the database
-        existing_giveaway = await db_client.giveaways.find_one({"_id": giveaway_id, "server_id": server_id})
-        if existing_giveaway and "image_url" in existing_giveaway:
-            await delete_from_cdn(existing_giveaway["image_url"])
-    elif image and image.filename:
+    if image and image.filename and not remove_image:
         # Add a timestamp to the title before uploading to avoid cache issues
         timestamp = pend.now(tz=pend.UTC).format("YYYYMMDDHHmmss")
         title_with_timestamp = f"giveaway_{giveaway_id}_{timestamp}"
         image_url = await upload_to_cdn(image=image, title=title_with_timestamp)
 
-    # Fetch existing giveaway to preserve its image if not removed
-    if not remove_image and not image_url:
-        existing_giveaway = await db_client.giveaways.find_one({"_id": giveaway_id, "server_id": server_id})
-        if existing_giveaway:
-            image_url = existing_giveaway.get("image_url")
-
-    # Update or create a giveaway in the database
     giveaway_data = {
-        "_id": giveaway_id,  # Ensure the unique giveaway_id is stored
         "prize": prize,
         "channel_id": int(channel),
         "start_time": start_time,
@@ -149,7 +149,6 @@ async def submit_giveaway_form(
         "text_above_embed": text_above_embed,
         "text_in_embed": text_in_embed,
         "text_on_end": text_on_end,
-        "image_url": image_url,
         "profile_picture_required": profile_picture_required,
         "coc_account_required": coc_account_required,
         "roles_mode": roles_mode,
@@ -157,27 +156,34 @@ async def submit_giveaway_form(
         "boosters": parsed_boosters
     }
 
-    if await db_client.giveaways.find_one({"_id": giveaway_id, "server_id": server_id}):
-        # Add modification timestamp
-        giveaway_data["updated"] = "yes"
-        # Update existing giveaway
-        await db_client.giveaways.update_one(
-            {"_id": giveaway_id, "server_id": server_id},
-            {"$set": giveaway_data}
-        )
+    # Update or create the giveaway in one round trip. The update is a pipeline so that
+    # values are taken literally, the stored image is kept when no new one was sent,
+    # and only edits of an existing giveaway are flagged as updated
+    fields = {key: {"$literal": value} for key, value in giveaway_data.items()}
+    if remove_image or image_url:
+        fields["image_url"] = {"$literal": image_url}
+    else:
+        fields["image_url"] = {"$ifNull": ["$image_url", None]}
+    fields["updated"] = {"$cond": [{"$ifNull": ["$status", False]}, "yes", "$$REMOVE"]}
+    fields["status"] = {"$ifNull": ["$status", "scheduled"]}
+
+    previous = await db_client.giveaways.find_one_and_update(
+        {"_id": giveaway_id, "server_id": server_id},
+        [{"$set": fields}],
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if previous is not None:
+        if remove_image and previous.get("image_url"):
+            await delete_from_cdn(previous["image_url"])
         status_message = "Giveaway updated successfully. If the giveaway is already live, it will be updated within a minute."
-
+    elif now:
+        status_message = "Giveaway created successfully. It will be sent shortly."
     else:
-        # Create a new giveaway
-        giveaway_data["server_id"] = server_id
-        giveaway_data["status"] = "scheduled"
-        await db_client.giveaways.insert_one(giveaway_data)
-        if now:
-            status_message = "Giveaway created successfully. It will be sent shortly."
-        else:
-            status_message = "Giveaway created successfully. It will start at the specified time."
-
-        # Redirect to the dashboard with a status message
+        status_message = "Giveaway created successfully. It will start at the specified time."
+
+    # Redirect to the dashboard with a status message
     redirect_url = f"/giveaway/dashboard?token={token}&message={status_message}"
     return RedirectResponse(url=redirect_url, status_code=303)
 
@@ -185,14 +191,17 @@ async def submit_giveaway_form(
 @router.get("/create", response_class=HTMLResponse)
 async def create_page(request: Request, token: str):
     # Verify the token
-    token_data = await db_client.tokens.find_one({"token": token, "type": "giveaway"})
-    if not token_data:
-        return JSONResponse({"detail": "Invalid token."}, status_code=403)
+    try:
+        token_data = await validate_token(token, expected_type="giveaway")
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=403)
 
     server_id = token_data["server_id"]
 
-    roles = await get_roles(guild_id=server_id)
-    channels = await get_channels(guild_id=server_id)
+    roles, channels = await asyncio.gather(
+        get_roles(guild_id=server_id),
+        get_channels(guild_id=server_id)
+    )
 
     return templates.TemplateResponse("giveaways/giveaway_create.html", {
         "request": request,
@@ -205,18 +214,20 @@ async def create_page(request: Request, token: str):
 
 @router.get("/edit/{giveaway_id}", response_class=HTMLResponse)
 async def edit_page(request: Request, token: str, giveaway_id: str):
-    token_data = await db_client.tokens.find_one({"token": token, "type": "giveaway"})
-    if not token_data:
-        raise HTTPException(status_code=403, detail="Invalid token.")
-
-    giveaway = await db_client.giveaways.find_one({"_id": giveaway_id})
-    if not giveaway:
-        raise HTTPException(status_code=404, detail="Giveaway not found.")
+    try:
+        token_data = await validate_token(token, expected_type="giveaway")
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
 
     server_id = token_data["server_id"]
 
-    roles = await get_roles(guild_id=server_id)
-    channels = await get_channels(guild_id=server_id)
+    giveaway, roles, channels = await asyncio.gather(
+        db_client.giveaways.find_one({"_id": giveaway_id, "server_id": server_id}),
+        get_roles(guild_id=server_id),
+        get_channels(guild_id=server_id)
+    )
+    if not giveaway:
+        raise HTTPException(status_code=404, detail="Giveaway not found.")
 
     return templates.TemplateResponse("giveaways/giveaway_edit.html", {
         "request": request,
@@ -233,12 +244,14 @@ async def delete_giveaway(giveaway_id: str, token: str, server_id: str):
     """
     Delete a giveaway from the database.
     """
-    print(giveaway_id, token, server_id)
     # Convert to the correct types
     server_id = int(server_id)
     # Verify the token
-    token_data = await db_client.tokens.find_one({"token": token, "server_id": server_id})
-    if not token_data:
+    try:
+        token_data = await validate_token(token)
+    except ValueError as e:
+        return JSONResponse({"message": str(e)}, status_code=403)
+    if token_data["server_id"] != server_id:
         return JSONResponse({"message": "Invalid token."}, status_code=403)
 
     # Delete the giveaway
@@ -69,7 +69,7 @@ async def super_troop_boost_rate(start_season: str, end_season: str, request: Re
         {"$set": {"name": "$grouped._id", "boosts": "$grouped.boosts"}},
         {"$unset": ["grouped", "total"]}
     ]
-    results = await db_client.player_history.aggregate(pipeline=pipeline).to_list(length=None)
+    results = await (await db_client.player_history.aggregate(pipeline=pipeline)).to_list(length=None)
     return results
 
 
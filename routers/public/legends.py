@@ -57,7 +57,7 @@ async def trophy_bucket(request: Request, response: Response):
             'output': {'count': {'$sum': 1}}}
         }
     ]
-    results = await db_client.legend_rankings.aggregate(pipeline=pipeline).to_list(length=None)
+    results = await (await db_client.legend_rankings.aggregate(pipeline=pipeline)).to_list(length=None)
     return {"items" : results}
 
 
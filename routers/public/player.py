@@ -154,7 +154,7 @@ async def player_warhits(player_tag: str, request: Request, response: Response,
         {"$project": {"data": "$data"}},
         {"$sort" : {"data.preparationStartTime" : -1}}
     ]
-    wars = await db_client.clan_wars.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+    wars = await (await db_client.clan_wars.aggregate(pipeline, allowDiskUse=True)).to_list(length=None)
     found_wars = set()
     stats = {"items" : []}
     local_limit = 0
@@ -363,7 +363,7 @@ async def search_players(name: str, request: Request, response: Response):
         },
         {"$limit": 25}
     ]
-    results = await db_client.player_search.aggregate(pipeline=pipeline).to_list(length=None)
+    results = await (await db_client.player_search.aggregate(pipeline=pipeline)).to_list(length=None)
     for result in results:
         del result["_id"]
     return {"items" : results}
@@ -440,7 +440,7 @@ async def full_search_players(name: str, request: Request, response: Response,
         {"$limit" : min(limit, 1000)}
     ]
 
-    results = await db_client.basic_clan.aggregate(pipeline=pipeline).to_list(length=None)
+    results = await (await db_client.basic_clan.aggregate(pipeline=pipeline)).to_list(length=None)
     return {"items" : [member | {'clan_name' : doc['clan_name'], 'clan_tag' : doc['clan_tag']} for doc in results for member in doc['memberList']]}
 
 
@@ -490,7 +490,7 @@ async def player_join_leave(player_tag: str, request: Request, response: Respons
             "$limit": limit
         }
     ]
-    result = await db_client.join_leave_history.aggregate(pipeline).to_list(length=None)
+    result = await (await db_client.join_leave_history.aggregate(pipeline)).to_list(length=None)
 
     def process_clan_events(events):
         """
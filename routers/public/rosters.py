@@ -7,15 +7,13 @@ import base64
 import pendulum as pend
 from fastapi import APIRouter, Form, File, UploadFile
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 
 from starlette.requests import Request
 from utils.utils import fix_tag, db_client, upload_to_cdn
+from utils.templating import templates
 
 router = APIRouter(prefix="/roster", include_in_schema=False)
 
-templates = Jinja2Templates(directory="templates")
-
 
 @router.get("/", response_class=HTMLResponse)
 async def get_form(request: Request, token: str):
@@ -25,7 +25,7 @@ async def server_settings(server_id: int, request: Request, response: Response,
         {"$lookup": {"from": "builderleagueroles", "localField": "server", "foreignField": "server", "as": "eval.builder_league_roles"}},
         {"$lookup": {"from": "clans", "localField": "server", "foreignField": "server", "as": "clans"}},
     ]
-    results = await db_client.server_db.aggregate(pipeline).to_list(length=1)
+    results = await (await db_client.server_db.aggregate(pipeline)).to_list(length=1)
     if not results:
         raise HTTPException(status_code=404, detail="Server Not Found")
     results = json.loads(json_util.dumps(results[0]))
@@ -48,7 +48,7 @@ async def donations(request: Request, response: Response,
             .sort("donationsRank", 1).limit(limit=limit).to_list(length=None)
         pipeline = [{"$match": {"tag": {"$in": [i.get("_id") for i in rank_results]}}},
                     {"$group": {"_id": "$tag", "th": {"$last": "$townhall"}}}]
-        th_results = await db_client.attack_db.aggregate(pipeline).to_list(length=None)
+        th_results = await (await db_client.attack_db.aggregate(pipeline)).to_list(length=None)
         th_results = {item.get("_id"): item.get("th") for item in th_results}
         for r in rank_results:
             new_data.append({
@@ -287,7 +287,7 @@ async def clan_games(request: Request, response: Response,
             {"$sort": {"tag": 1, "time": 1}},
             {"$group": {"_id": "$tag", "first": {"$first": "$time"}, "last": {"$last": "$time"}}}
         ]
-        results: List[dict] = await db_client.player_history.aggregate(pipeline).to_list(length=None)
+        results: List[dict] = await (await db_client.player_history.aggregate(pipeline)).to_list(length=None)
         member_stat_dict = {}
         for m in results:
             member_stat_dict[m["_id"]] = {"first": m["first"], "last": m["last"]}
@@ -328,7 +328,7 @@ async def clan_games(request: Request, response: Response,
             {"$sort": {"tag": 1, "time": 1}},
             {"$group": {"_id": "$tag", "first": {"$first": "$time"}, "last": {"$last": "$time"}}}
         ]
-        results: List[dict] = await db_client.player_history.aggregate(pipeline).to_list(length=None)
+        results: List[dict] = await (await db_client.player_history.aggregate(pipeline)).to_list(length=None)
         member_stat_dict = {}
         for m in results:
             member_stat_dict[m["_id"]] = {"first": m["first"], "last": m["last"]}
@@ -451,7 +451,7 @@ async def war_stats(request: Request, response: Response,
             {"$unset": ["_id"]},
             {"$project": {"data" : "$data"}}
         ]
-        wars = await db_client.clan_wars.aggregate(pipeline, allowDiskUse=True, maxTimeMS=60000).to_list(length=None)
+        wars = await (await db_client.clan_wars.aggregate(pipeline, allowDiskUse=True, maxTimeMS=60000)).to_list(length=None)
         found_wars = set()
         for war in wars:
             war = war.get("data")
@@ -516,7 +516,7 @@ async def war_stats(request: Request, response: Response,
             {"$unset": ["_id"]},
             {"$project": {"data": "$data"}}
         ]
-        wars: List[dict] = await db_client.clan_wars.aggregate(pipeline, allowDiskUse=True, maxTimeMS=60000).to_list(length=None)
+        wars: List[dict] = await (await db_client.clan_wars.aggregate(pipeline, allowDiskUse=True, maxTimeMS=60000)).to_list(length=None)
         found_wars = set()
         for war in wars:
             war = war.get("data")
@@ -743,7 +743,7 @@ async def capital_stats(request: Request, response: Response,
             {"$match" : {"$and" : [{"data.members.tag" : {"$in" : players}}, {"data.startTime" : {"$gte" : WEEKEND_START}}, {"data.endTime" : {"$lte" : WEEKEND_END}}]}},
             {"$unset": ["_id"]}
         ]
-        raids = await db_client.capital.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+        raids = await (await db_client.capital.aggregate(pipeline, allowDiskUse=True)).to_list(length=None)
 
         player_stats = await db_client.player_stats_db.find({"tag" : {"$in" : players}}, {"tag" : 1, "capital_gold" : 1}).to_list(length=None)
         donated_capital = {}
@@ -773,7 +773,7 @@ async def capital_stats(request: Request, response: Response,
             {"$match": {"$and": [{"clan_tag": {"$in": clans}}, {"data.startTime": {"$gte": WEEKEND_START}}, {"data.endTime": {"$lte": WEEKEND_END}}]}},
             {"$unset": ["_id"]}
         ]
-        raids = await db_client.capital.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+        raids = await (await db_client.capital.aggregate(pipeline, allowDiskUse=True)).to_list(length=None)
 
         player_tags = set()
         for raid in raids:
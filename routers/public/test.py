@@ -1,171 +1,161 @@
-import copy
+from operator import itemgetter
 from typing import Optional
 from fastapi import Request, APIRouter
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 import aiohttp
+import numpy as np
+
+from utils.templating import templates
 
 router = APIRouter(tags=["War Timeline"])
-templates = Jinja2Templates(directory="templates")
-
-def extract_attacks(war_data):
-    all_attacks = []
-    clan = war_data["clan"]
-    opponent = war_data["opponent"]
-
-    # Extract clan attacks
-    for m in clan["members"]:
-        for a in m.get("attacks", []):
-            all_attacks.append({
-                "attackerClan": "clan",
-                "attackerTag": a["attackerTag"],
-                "defenderTag": a["defenderTag"],
-                "stars": a["stars"],
-                "destructionPercentage": a["destructionPercentage"],
-                "order": a["order"],
-                "duration": a.get("duration", 0)
-            })
-
-    # Extract opponent attacks
-    for m in opponent["members"]:
-        for a in m.get("attacks", []):
-            all_attacks.append({
-                "attackerClan": "opponent",
-                "attackerTag": a["attackerTag"],
-                "defenderTag": a["defenderTag"],
-                "stars": a["stars"],
-                "destructionPercentage": a["destructionPercentage"],
-                "order": a["order"],
-                "duration": a.get("duration", 0)
-            })
-
-    return sorted(all_attacks, key=lambda x: x["order"])
-
-def initialize_member_stats(members):
-    member_stats = {}
-    for m in members:
-        member_stats[m["tag"]] = {
-            "tag": m["tag"],
-            "attacks_used": 0,
-            "defenses_used": 0
+
+def extract_attacks(clan, opponent):
+    """
+    Flatten both sides' attacks into tuples of
+    (attacker_is_clan, attacker_tag, defender_tag, stars, destruction, order, duration),
+    sorted by attack order.
+    """
+    all_attacks = [
+        (attacker_is_clan, a["attackerTag"], a["defenderTag"], a["stars"], a["destructionPercentage"],
+         a["order"], a.get("duration", 0))
+        for attacker_is_clan, side in ((True, clan), (False, opponent))
+        for m in side["members"]
+        for a in m.get("attacks", [])
+    ]
+    all_attacks.sort(key=itemgetter(5))
+    return all_attacks
+
+def attack_details(attack):
+    attacker_is_clan, attacker_tag, defender_tag, stars, destruction, order, duration = attack
+    return {
+        "attackerClan": "clan" if attacker_is_clan else "opponent",
+        "attackerTag": attacker_tag,
+        "defenderTag": defender_tag,
+        "stars": stars,
+        "destructionPercentage": destruction,
+        "order": order,
+        "duration": duration
+    }
+
+def snapshot_member_stats(tags, attacks_used, defenses_used):
+    return [
+        {"tag": tag, "attacks_used": attacks, "defenses_used": defenses}
+        for tag, attacks, defenses in zip(tags, attacks_used, defenses_used)
+    ]
+
+def running_member_counts(steps, mask, member_idx, size):
+    # Scatter one increment per matching attack into its member column, then
+    # accumulate down the attack axis so row i holds the counts after attack i.
+    # Row 0 is the start of the war
+    mask = mask & (member_idx >= 0)
+    increments = np.zeros((len(steps) + 1, size), dtype=np.int64)
+    np.add.at(increments, (steps[mask] + 1, member_idx[mask]), 1)
+    return np.cumsum(increments, axis=0)
+
+def prefix_sum(values):
+    return np.concatenate(([0], np.cumsum(values)))
+
+class TimelineCursor:
+    """
+    War timeline held as prefix sums, frame 0 is the start of the war and frame i the state
+    after the i-th attack. Frames are built on demand instead of keeping a roster snapshot per attack.
+    """
+
+    def __init__(self, attacks, clan_members, opponent_members, team_size):
+        self.attacks = attacks
+        count = len(attacks)
+
+        self.clan_tags = list(dict.fromkeys(m["tag"] for m in clan_members))
+        self.opponent_tags = list(dict.fromkeys(m["tag"] for m in opponent_members))
+        clan_index = {tag: i for i, tag in enumerate(self.clan_tags)}
+        opponent_index = {tag: i for i, tag in enumerate(self.opponent_tags)}
+
+        # Attacks as parallel arrays, every cumulative stat is then a prefix sum
+        is_clan = np.fromiter((a[0] for a in attacks), dtype=bool, count=count)
+        stars = np.fromiter((a[3] for a in attacks), dtype=np.int64, count=count)
+        destruction = np.fromiter((a[4] for a in attacks), dtype=np.float64, count=count)
+        attacker_idx = np.fromiter(
+            ((clan_index if a[0] else opponent_index).get(a[1], -1) for a in attacks),
+            dtype=np.int64, count=count
+        )
+        defender_idx = np.fromiter(
+            ((opponent_index if a[0] else clan_index).get(a[2], -1) for a in attacks),
+            dtype=np.int64, count=count
+        )
+        steps = np.arange(count)
+
+        self.clan_stars = prefix_sum(np.where(is_clan, stars, 0)).tolist()
+        self.opponent_stars = prefix_sum(np.where(is_clan, 0, stars)).tolist()
+        self.clan_destruction = ((prefix_sum(np.where(is_clan, destruction, 0.0)) / (team_size * 100)) * 100).tolist()
+        self.opponent_destruction = ((prefix_sum(np.where(is_clan, 0.0, destruction)) / (team_size * 100)) * 100).tolist()
+        self.clan_attacks_used = prefix_sum(is_clan).tolist()
+        self.opponent_attacks_used = prefix_sum(~is_clan).tolist()
+
+        self.clan_attacks = running_member_counts(steps, is_clan, attacker_idx, len(clan_index))
+        self.clan_defenses = running_member_counts(steps, ~is_clan, defender_idx, len(clan_index))
+        self.opponent_attacks = running_member_counts(steps, ~is_clan, attacker_idx, len(opponent_index))
+        self.opponent_defenses = running_member_counts(steps, is_clan, defender_idx, len(opponent_index))
+
+    def __len__(self):
+        return len(self.attacks) + 1
+
+    def frame(self, i):
+        attack = self.attacks[i - 1] if i else None
+        return {
+            "order": attack[5] if attack else 0,
+            "clan_stars": self.clan_stars[i],
+            "clan_destruction": self.clan_destruction[i],
+            "clan_attacks_used": self.clan_attacks_used[i],
+            "opponent_stars": self.opponent_stars[i],
+            "opponent_destruction": self.opponent_destruction[i],
+            "opponent_attacks_used": self.opponent_attacks_used[i],
+            "clan_members": snapshot_member_stats(
+                self.clan_tags, self.clan_attacks[i].tolist(), self.clan_defenses[i].tolist()),
+            "opponent_members": snapshot_member_stats(
+                self.opponent_tags, self.opponent_attacks[i].tolist(), self.opponent_defenses[i].tolist()),
+            "last_attack": attack_details(attack) if attack else None
         }
-    return member_stats
-
-def compute_timeline(war_data):
-    clan = war_data["clan"]
-    opponent = war_data["opponent"]
-    attacks_per_member = war_data.get("attacksPerMember", 1)
-    team_size = war_data["teamSize"]
-
-    all_attacks = extract_attacks(war_data)
-
-    # Initialize cumulative stats
-    clan_stars = 0
-    clan_destruction = 0.0
-    clan_attacks_used = 0
-
-    opponent_stars = 0
-    opponent_destruction = 0.0
-    opponent_attacks_used = 0
-
-    clan_members_stats = initialize_member_stats(clan["members"])
-    opponent_members_stats = initialize_member_stats(opponent["members"])
-
-    sum_clan_destruction = 0.0
-    sum_opponent_destruction = 0.0
-
-    war_timeline = [{
-        "order": 0,
-        "clan_stars": 0,
-        "clan_destruction": 0.0,
-        "clan_attacks_used": 0,
-        "opponent_stars": 0,
-        "opponent_destruction": 0.0,
-        "opponent_attacks_used": 0,
-        "clan_members": copy.deepcopy(list(clan_members_stats.values())),
-        "opponent_members": copy.deepcopy(list(opponent_members_stats.values())),
-        "last_attack": None
-    }]
-
-    for attack in all_attacks:
-        if attack["attackerClan"] == "clan":
-            clan_stars += attack["stars"]
-            sum_clan_destruction += attack["destructionPercentage"]
-            clan_attacks_used += 1
-
-            if attack["attackerTag"] in clan_members_stats:
-                clan_members_stats[attack["attackerTag"]]["attacks_used"] += 1
-            if attack["defenderTag"] in opponent_members_stats:
-                opponent_members_stats[attack["defenderTag"]]["defenses_used"] += 1
-
-        else:
-            opponent_stars += attack["stars"]
-            sum_opponent_destruction += attack["destructionPercentage"]
-            opponent_attacks_used += 1
-
-            if attack["attackerTag"] in opponent_members_stats:
-                opponent_members_stats[attack["attackerTag"]]["attacks_used"] += 1
-            if attack["defenderTag"] in clan_members_stats:
-                clan_members_stats[attack["defenderTag"]]["defenses_used"] += 1
-
-        clan_destruction = (sum_clan_destruction / (team_size * 100)) * 100
-        opponent_destruction = (sum_opponent_destruction / (team_size * 100)) * 100
-
-        war_timeline.append({
-            "order": attack["order"],
-            "clan_stars": clan_stars,
-            "clan_destruction": clan_destruction,
-            "clan_attacks_used": clan_attacks_used,
-            "opponent_stars": opponent_stars,
-            "opponent_destruction": opponent_destruction,
-            "opponent_attacks_used": opponent_attacks_used,
-            "clan_members": copy.deepcopy(list(clan_members_stats.values())),
-            "opponent_members": copy.deepcopy(list(opponent_members_stats.values())),
-            "last_attack": attack
-        })
-
-    return war_timeline
+
+def compute_timeline(clan, opponent, team_size):
+    return TimelineCursor(extract_attacks(clan, opponent), clan["members"], opponent["members"], team_size)
 
 @router.get("/timeline/{clan_tag}", response_class=HTMLResponse)
 @router.get("/timeline/{clan_tag}/{timestamp}", response_class=HTMLResponse)
 async def get_war(request: Request, clan_tag: str, timestamp: Optional[str] = None):
-    war_data = None
+    session: aiohttp.ClientSession = request.app.state.http
     if timestamp is None:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"https://proxy.clashk.ing/v1/clans/{clan_tag.replace('#','%23')}/currentwar") as response:
-                if response.status == 200:
-                    war_data = await response.json()
+        url = f"https://proxy.clashk.ing/v1/clans/{clan_tag.replace('#', '%23')}/currentwar"
     else:
         # Fetch specific war by timestamp
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    f"https://api.clashk.ing/war/{clan_tag.replace('#', '%23')}/previous/{timestamp}") as response:
-                if response.status == 200:
-                    war_data = await response.json()
+        url = f"https://api.clashk.ing/war/{clan_tag.replace('#', '%23')}/previous/{timestamp}"
+
+    war_data = None
+    async with session.get(url) as response:
+        if response.status == 200:
+            war_data = await response.json()
 
     # If no war_data found even after all logic
     if war_data is None:
         return HTMLResponse("<h1>No war data available</h1>", status_code=404)
 
-    # Ensure clan/opponent orientation
-    if war_data["clan"]["tag"] != clan_tag:
-        tmp = war_data["clan"]
-        war_data["clan"] = war_data["opponent"]
-        war_data["opponent"] = tmp
-
-    war_timeline = compute_timeline(war_data)
+    # Orient the war from the requested clan's side without mutating the fetched data
+    if war_data["clan"]["tag"] == clan_tag:
+        clan_side, opp_side = war_data["clan"], war_data["opponent"]
+    else:
+        clan_side, opp_side = war_data["opponent"], war_data["clan"]
 
-    wars_available = []
+    war_timeline = compute_timeline(clan_side, opp_side, war_data["teamSize"])
 
+    # Past wars are not fetched here, the page only needs the selected war. The list of
+    # previous wars is served separately by /war/{clan_tag}/previous for clients that want it
     return templates.TemplateResponse(
         "war.html",
         {
             "request": request,
             "war_timeline": war_timeline,
-            "clan": war_data["clan"],
-            "opponent": war_data["opponent"],
+            "clan": clan_side,
+            "opponent": opp_side,
             "attacks_per_member": war_data.get("attacksPerMember", 1),
-            "wars_available": wars_available,
             "selected_timestamp": timestamp,
             "clan_tag": clan_tag
         }
@@ -1,5 +1,6 @@
 import datetime
 import aiohttp
+from aiocache import cached
 import json
 import re
 import uuid
@@ -7,20 +8,20 @@ import base64
 import pendulum as pend
 from fastapi import APIRouter, Form, File, UploadFile
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 
 from starlette.requests import Request
 from utils.utils import fix_tag, db_client, upload_to_cdn, config
+from utils.templating import templates
+from utils.cache import get_or_set
 
 router = APIRouter(prefix="/ticketing", include_in_schema=False)
 
-templates = Jinja2Templates(directory="templates")
 
 TOKEN = config.bot_token
 
 BASE_URL = 'https://discord.com/api/v10'
 
-async def get_roles(guild_id):
+async def fetch_roles(guild_id):
     url = f'{BASE_URL}/guilds/{guild_id}/roles'
     headers = {
         'Authorization': f'Bot {TOKEN}',
@@ -35,7 +36,7 @@ async def get_roles(guild_id):
                 print(f"Failed to get roles: {response.status}")
                 return None
 
-async def get_channels(guild_id):
+async def fetch_channels(guild_id):
     url = f'{BASE_URL}/guilds/{guild_id}/channels'
     headers = {
         'Authorization': f'Bot {TOKEN}',
@@ -63,6 +64,19 @@ async def fetch_emojis(guild_id):
             else:
                 response.raise_for_status()
 
+# Guild data is cached in process in front of Redis, dashboard navigation asks for the same guild
+# repeatedly. A worker can hold a value Redis already held for up to GUILD_CACHE_TTL, so a new
+# channel or role shows up within 2 * GUILD_CACHE_TTL (60s). Failed lookups return None and are not cached
+GUILD_CACHE_TTL = 30
+
+@cached(ttl=GUILD_CACHE_TTL, key_builder=lambda f, guild_id: f"{f.__name__}:{guild_id}", skip_cache_func=lambda r: r is None)
+async def get_roles(guild_id):
+    return await get_or_set(f"guild:{guild_id}:roles", ttl=GUILD_CACHE_TTL, fetch=lambda: fetch_roles(guild_id))
+
+@cached(ttl=GUILD_CACHE_TTL, key_builder=lambda f, guild_id: f"{f.__name__}:{guild_id}", skip_cache_func=lambda r: r is None)
+async def get_channels(guild_id):
+    return await get_or_set(f"guild:{guild_id}:channels", ttl=GUILD_CACHE_TTL, fetch=lambda: fetch_channels(guild_id))
+
 def filter_categories(channels):
     return [channel for channel in channels if channel['type'] == 4]
 
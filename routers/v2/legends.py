@@ -71,7 +71,7 @@ async def legend_stats_day(day: str, request: Request, response: Response, playe
     ]
 
     # Execute the aggregation
-    combined_data = await db_client.player_stats_db.aggregate(pipeline).to_list(length=None)
+    combined_data = await (await db_client.player_stats_db.aggregate(pipeline)).to_list(length=None)
 
     return remove_id_fields(combined_data)
 
@@ -129,7 +129,7 @@ async def legend_stats_season(season: str, request: Request, response: Response,
     ]
 
     # Execute the aggregation
-    combined_data = await db_client.player_stats_db.aggregate(pipeline).to_list(length=None)
+    combined_data = await (await db_client.player_stats_db.aggregate(pipeline)).to_list(length=None)
     year, month = season.split('-')
     season_start = coc.utils.get_season_start(month=int(month) - 1, year=int(year))
     season_end = coc.utils.get_season_end(month=int(month) - 1, year=int(year))
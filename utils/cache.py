@@ -0,0 +1,40 @@
+import bson
+import redis
+from redis import asyncio as aioredis
+
+from .config import Config
+
+config = Config()
+
+# The app's single Redis client, re-exported by utils.utils as `redis`
+redis_client = aioredis.Redis(host=config.redis_ip, port=6379, db=1, password=config.redis_pw, retry_on_timeout=True,
+                              max_connections=25, retry_on_error=[redis.ConnectionError])
+
+
+async def get_or_set(key: str, ttl: int, fetch):
+    """
+    Return the cached value for key, or await fetch() and cache its result for ttl seconds.
+    None results are not cached, and Redis being unavailable falls back to fetch().
+    Values are stored as BSON so datetimes and ObjectIds from Mongo survive the round trip.
+    """
+    try:
+        cached = await redis_client.get(key)
+    except redis.RedisError:
+        return await fetch()
+    if cached is not None:
+        return bson.decode(cached)["value"]
+
+    value = await fetch()
+    if value is not None:
+        try:
+            await redis_client.set(key, bson.encode({"value": value}), ex=ttl)
+        except redis.RedisError:
+            pass
+    return value
+
+
+async def invalidate(*keys: str):
+    try:
+        await redis_client.delete(*keys)
+    except redis.RedisError:
+        pass
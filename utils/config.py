@@ -28,5 +28,6 @@ class Config:
     is_local = (getenv("LOCAL") == "TRUE")
 
     client_secret = getenv("CLIENT_SECRET")
+    dashboard_token_secret = getenv("DASHBOARD_TOKEN_SECRET")
     bot_token = getenv("BOT_TOKEN")
 
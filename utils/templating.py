@@ -0,0 +1,25 @@
+import os
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from .config import Config
+
+config = Config()
+
+TEMPLATE_DIR = "templates"
+BYTECODE_CACHE_DIR = ".jinja_cache"
+
+os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+
+# One environment shared by every router, compiled templates stay in memory and
+# their bytecode is kept on disk so a restart doesn't recompile everything
+shared_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,
+    auto_reload=config.is_local,
+    cache_size=400,
+    bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_DIR),
+)
+
+templates = Jinja2Templates(env=shared_env)
@@ -1,10 +1,11 @@
-import motor.motor_asyncio
-from redis import asyncio as aioredis
-import redis
+from pymongo import AsyncMongoClient
+from pymongo.errors import PyMongoError
 import re
 from dotenv import load_dotenv
 import coc
+import jwt
 import os
+import logging
 
 import pendulum as pend
 from datetime import datetime, timedelta
@@ -17,12 +18,14 @@ from json import loads as json_loads
 from slowapi import Limiter
 from slowapi.util import get_ipaddr
 from .config import Config
+from .cache import redis_client as redis, get_or_set, invalidate
 from collections import deque
 from datetime import datetime
 import pytz
 
 
 config = Config()
+logger = logging.getLogger(__name__)
 
 limiter = Limiter(key_func=get_ipaddr, key_style="endpoint")
 
@@ -34,12 +37,8 @@ def dynamic_limit(key: str):
 
 
 load_dotenv()
-client = motor.motor_asyncio.AsyncIOMotorClient(config.stats_mongodb, compressors="snappy")
-other_client = motor.motor_asyncio.AsyncIOMotorClient(config.static_mongodb)
-
-redis = aioredis.Redis(host=config.redis_ip, port=6379, db=1, password=config.redis_pw, retry_on_timeout=True,
-                       max_connections=25, retry_on_error=[redis.ConnectionError])
-
+client = AsyncMongoClient(config.stats_mongodb, compressors="snappy")
+other_client = AsyncMongoClient(config.static_mongodb)
 
 class DBClient():
     def __init__(self):
@@ -105,6 +104,18 @@ class DBClient():
 db_client = DBClient()
 
 
+async def create_indexes():
+    """
+    Ensure the indexes behind the giveaway dashboard and token lookups exist.
+    """
+    try:
+        await db_client.giveaways.create_index([("server_id", 1), ("status", 1)])
+        await db_client.giveaways.create_index([("server_id", 1), ("end_time", -1)])
+        await db_client.tokens.create_index([("token", 1), ("type", 1)], unique=True)
+    except PyMongoError:
+        logger.exception("Failed to create indexes")
+
+
 async def download_image(url: str):
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as response:
@@ -248,7 +259,12 @@ async def upload_to_cdn(title: str, picture=None, image=None):
     if image is None:
         payload = picture.read()
     else:
-        payload = await image.read()
+        # Hand aiohttp the spooled file itself so the upload is streamed in chunks
+        # (read off the event loop) instead of loading the whole image into memory
+        await image.seek(0)
+        payload = image.file
+        if image.size is not None:
+            headers["content-length"] = str(image.size)
     title = title.replace(" ", "_").lower()
     async with aiohttp.ClientSession() as session:
         async with session.put(url=f"https://storage.bunnycdn.com/clashking-files/{title}.png", headers=headers,
@@ -319,19 +335,56 @@ def check_authentication(func):
     return wrapper
 
 
-async def validate_token(token, expected_type=None):
+TOKEN_ALGORITHM = "HS256"
+TOKEN_AUDIENCE = "clashking:dashboard"
+
+
+def decode_signed_token(token: str):
     """
-    Validate a token and return its data if valid.
+    Return the token data carried by a signed token, or None if the token isn't one.
+    Signed tokens are HS256 JWTs keyed with DASHBOARD_TOKEN_SECRET, with aud set to
+    TOKEN_AUDIENCE and exp, type and server_id claims. Raises ValueError once expired.
     """
-    token_data = await db_client.tokens.find_one({"token": token})
+    if not config.dashboard_token_secret:
+        return None
+    try:
+        payload = jwt.decode(token, config.dashboard_token_secret, algorithms=[TOKEN_ALGORITHM],
+                             audience=TOKEN_AUDIENCE, options={"require": ["exp", "aud", "type", "server_id"]})
+    except jwt.ExpiredSignatureError:
+        raise ValueError("Token expired.")
+    except jwt.InvalidTokenError:
+        return None
+    return {
+        "token": token,
+        "type": payload["type"],
+        "server_id": payload["server_id"],
+        "expires_at": datetime.fromtimestamp(payload["exp"], tz=pytz.utc).replace(tzinfo=None)
+    }
 
-    if not token_data:
-        raise ValueError("Invalid token.")
 
-    # Vérifier si le token a expiré
-    if token_data["expires_at"] < datetime.utcnow():
-        await db_client.tokens.delete_one({"token": token})  # Nettoyer
-        raise ValueError("Token expired.")
+async def get_stored_token(token: str):
+    """
+    Fetch a token document, cached for a minute to spare Mongo on repeated page loads.
+    """
+    return await get_or_set(f"token:{token}", ttl=60, fetch=lambda: db_client.tokens.find_one({"token": token}))
+
+
+async def validate_token(token, expected_type=None):
+    """
+    Validate a token and return its data if valid.
+    """
+    token_data = decode_signed_token(token)
+
+    if token_data is None:
+        token_data = await get_stored_token(token)
+        if not token_data:
+            raise ValueError("Invalid token.")
+
+        # Vérifier si le token a expiré
+        if token_data["expires_at"] < datetime.utcnow():
+            await db_client.tokens.delete_one({"token": token})  # Nettoyer
+            await invalidate(f"token:{token}")
+            raise ValueError("Token expired.")
 
     # Vérifier si le type correspond (si applicable)
     if expected_type and token_data["type"] != expected_type: